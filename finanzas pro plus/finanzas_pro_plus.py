@@ -1,20 +1,27 @@
 from __future__ import annotations
-import os, csv, sys, math, zipfile, json, webbrowser
-from datetime import datetime, date, timedelta
-from collections import defaultdict, deque
+import os, io, csv, sys, math, zipfile, json, webbrowser, functools, threading, textwrap
+from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import List, Dict, Tuple, Optional
 
+import numpy as np
+import pandas as pd
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
 # Matplotlib en Tk
 import matplotlib
 matplotlib.use("TkAgg")
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_pdf import PdfPages
 from matplotlib.ticker import FuncFormatter, MaxNLocator
+# get_renderer() reutiliza `renderer` mientras (ancho, alto, dpi) == `_lastKey`; ver FinanceApp._release_renderer
+_AGG_RENDERER_RELEASABLE = matplotlib.__version__.split(".")[0] == "3"
 
 # Estilo global
 PALETTE = {
@@ -24,7 +31,7 @@ PALETTE = {
     "grid": "#D0D7DE",
     "accent": "#6A5ACD",
 }
-plt.rcParams.update({
+matplotlib.rcParams.update({
     "axes.edgecolor": "#E5E7EB",
     "axes.titlesize": 14,
     "axes.labelsize": 12,
@@ -64,44 +71,44 @@ def ensure_csv(path: str):
             w.writerow(["2025-10-06","gasto","insumos","Materiales","220"])
             w.writerow(["2025-10-07","ingreso","otros","Reembolso","150"])
 
-def read_csv_file(path: str) -> List[dict]:
+def read_csv_file(path: str) -> pd.DataFrame:
+    """Carga el CSV en bloque; descarta filas con monto inválido."""
     ensure_csv(path)
-    rows = []
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            if not set(CSV_HEADERS) <= set(r.keys()): continue
-            try:
-                r["monto"] = float(r["monto"])
-            except Exception:
-                continue
-            rows.append(r)
-    return rows
+    return _read_csv_frame(path)
 
-def append_row(path: str, row: dict):
+def _read_csv_frame(src) -> pd.DataFrame:
+    """Parsea un CSV (ruta o buffer) con las columnas de CSV_HEADERS."""
+    # usecols como función no falla si faltan columnas; errores de codificación/formato sí llegan al usuario
+    try:
+        df = pd.read_csv(src, usecols=lambda c: c in CSV_HEADERS, dtype=str, keep_default_na=False,
+                         encoding="utf-8", engine="c")
+    except pd.errors.EmptyDataError:   # archivo vacío (0 bytes)
+        df = None
+    if df is None or not set(CSV_HEADERS) <= set(df.columns):   # faltan columnas: ninguna fila es válida
+        return pd.DataFrame({c: pd.Series(dtype=str) for c in CSV_HEADERS})
+    df["monto"] = pd.to_numeric(df["monto"], errors="coerce").astype(np.float64)
+    return df.dropna(subset=["monto"]).reset_index(drop=True)
+
+def append_rows(path: str, rows: List[dict]):
+    """Añade varias filas abriendo el archivo una sola vez."""
     with open(path, "a", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        writer.writerow(row)
+        writer.writerows(rows)
+
+def append_row(path: str, row: dict):
+    append_rows(path, [row])
+
+def _row_keys(df: pd.DataFrame) -> pd.Series:
+    """Clave de deduplicación: los 5 campos unidos por \\x1f en un único string."""
+    return df["fecha"].str.cat([df["tipo"], df["categoria"], df["descripcion"], df["monto"].astype(str)], sep="\x1f")
 
 def import_csv(target_path: str, source_path: str) -> int:
     base = read_csv_file(target_path)
-    existing = {(d["fecha"], d["tipo"], d["categoria"], d["descripcion"], float(d["monto"])) for d in base}
-    new_count = 0
-    with open(source_path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            if not set(CSV_HEADERS) <= set(r.keys()): continue
-            try:
-                tup = (r["fecha"], r["tipo"].lower(), r["categoria"], r["descripcion"], float(r["monto"]))
-            except Exception:
-                continue
-            if tup not in existing:
-                append_row(target_path, {
-                    "fecha": r["fecha"], "tipo": r["tipo"].lower(), "categoria": r["categoria"],
-                    "descripcion": r["descripcion"], "monto": tup[4],
-                })
-                new_count += 1
-    return new_count
+    src = _read_csv_frame(source_path)
+    src["tipo"] = src["tipo"].str.lower()
+    new = src.loc[~_row_keys(src).isin(_row_keys(base)), CSV_HEADERS]
+    if len(new): append_rows(target_path, new.to_dict("records"))
+    return len(new)
 
 # Configuración (ajustes financieros)
 DEFAULT_SETTINGS = {
@@ -111,99 +118,211 @@ DEFAULT_SETTINGS = {
     "tope_categoria": {"marketing": 15.0}  # % del gasto total (por ejemplo)
 }
 
+_saved_settings: Dict[str, str] = {}   # ruta -> último JSON leído/escrito en disco
+
+def _dump_settings(cfg: dict) -> str:
+    return json.dumps(cfg, indent=2, ensure_ascii=False)
+
 def read_settings(path: str=DEFAULT_CFG) -> dict:
     if not os.path.exists(path):
         save_settings(DEFAULT_SETTINGS, path)
     try:
         with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+            cfg = json.load(f)
+        _saved_settings[path] = _dump_settings(cfg)
+        return cfg
     except Exception:
         return DEFAULT_SETTINGS.copy()
 
 def save_settings(cfg: dict, path: str=DEFAULT_CFG):
+    """Escribe los ajustes solo si cambiaron respecto a lo que ya está en disco."""
+    text = _dump_settings(cfg)
+    if _saved_settings.get(path) == text: return
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2, ensure_ascii=False)
+        f.write(text)
+    _saved_settings[path] = text
 
 # Dominio
-@dataclass
-class FinanceRecord:
-    fecha: date
-    tipo: str          # ingreso | gasto
-    categoria: str
-    descripcion: str
-    monto: float
+TIPO_INGRESO, TIPO_GASTO, TIPO_OTRO = 0, 1, 2
+
+def _parse_dates(values: np.ndarray) -> np.ndarray:
+    """Fechas "YYYY-MM-DD" estrictas (como strptime) a datetime64[D]; las inválidas quedan como NaT."""
+    fechas = pd.to_datetime(pd.Series(values, dtype=object), format="%Y-%m-%d", errors="coerce")
+    return fechas.to_numpy().astype("datetime64[D]")
+
+def _encode_categories(values) -> Tuple[np.ndarray, np.ndarray]:
+    """Codifica categorías como (códigos int32, tabla de nombres en orden de aparición)."""
+    codes, names = pd.factorize(pd.Series(values, dtype=object))
+    return codes.astype(np.int32), np.asarray(names, dtype=object)
+
+def _group_sum(keys: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Suma `weights` agrupando por `keys` (claves ordenadas)."""
+    uniq, inv = np.unique(keys, return_inverse=True)
+    return uniq, np.bincount(inv, weights=weights, minlength=len(uniq))
+
+def _cached(fn):
+    """Memoriza una agregación en la instancia (FinanceData no cambia tras construirse)."""
+    @functools.wraps(fn)
+    def wrapper(self):
+        if fn.__name__ not in self._cache:
+            self._cache[fn.__name__] = fn(self)
+        return self._cache[fn.__name__]
+    return wrapper
 
 @dataclass
 class FinanceData:
-    records: List[FinanceRecord] = field(default_factory=list)
+    # Columnas paralelas (una fila por movimiento)
+    fecha: np.ndarray = field(default_factory=lambda: np.empty(0, dtype="datetime64[D]"))
+    tipo: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint8))   # 0=ingreso, 1=gasto, 2=otro
+    cat_codes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))  # índice en cat_names
+    cat_names: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=object))   # orden de aparición
+    descripcion: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=object))
+    monto: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    mes: np.ndarray = field(init=False, repr=False)   # fecha truncada a mes (datetime64[M])
+    _cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.mes = self.fecha.astype("datetime64[M]")
 
     @staticmethod
-    def from_rows(rows: List[dict]) -> "FinanceData":
-        out = []
-        for r in rows:
-            try:
-                out.append(FinanceRecord(
-                    fecha=datetime.strptime(r["fecha"], "%Y-%m-%d").date(),
-                    tipo=r["tipo"].strip().lower(),
-                    categoria=r["categoria"].strip(),
-                    descripcion=r.get("descripcion","").strip(),
-                    monto=float(r["monto"]),
-                ))
-            except Exception:
-                continue
-        return FinanceData(out)
+    def from_frame(df: pd.DataFrame) -> "FinanceData":
+        """Construye las columnas directamente desde `read_csv_file`."""
+        fecha = _parse_dates(df["fecha"].to_numpy(dtype=object))
+        ok = ~np.isnat(fecha)
+        df = df[ok]; fecha = fecha[ok]
+        tipo = df["tipo"].str.strip().str.lower()
+        cat_codes, cat_names = _encode_categories(df["categoria"].str.strip())
+        return FinanceData(
+            fecha=fecha,
+            tipo=np.select([tipo.eq("ingreso").to_numpy(bool), tipo.eq("gasto").to_numpy(bool)],
+                           [TIPO_INGRESO, TIPO_GASTO], TIPO_OTRO).astype(np.uint8),
+            cat_codes=cat_codes, cat_names=cat_names,
+            descripcion=df["descripcion"].str.strip().to_numpy(dtype=object),
+            monto=df["monto"].to_numpy(dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.monto)
+
+    def _take(self, idx: np.ndarray) -> "FinanceData":
+        return FinanceData(fecha=self.fecha[idx], tipo=self.tipo[idx], cat_codes=self.cat_codes[idx],
+                           cat_names=self.cat_names, descripcion=self.descripcion[idx], monto=self.monto[idx])
+
+    def _memo_last(self, name: str, key, compute):
+        """Memoriza `compute()` bajo `name` solo para la última `key` (p. ej. el filtro o los ajustes vigentes)."""
+        last = self._cache.get(name)
+        if last is None or last[0] != key:
+            last = self._cache[name] = (key, compute())
+        return last[1]
 
     def filter_period(self, month: Optional[str]=None, start: Optional[str]=None, end: Optional[str]=None) -> "FinanceData":
-        def in_range(d: date) -> bool:
-            if month:
-                try:
-                    mstart = datetime.strptime(month+"-01", "%Y-%m-%d").date()
-                    mend = (mstart.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                    return mstart <= d <= mend
-                except Exception:
-                    return True
-            s = datetime.strptime(start, "%Y-%m-%d").date() if start else None
-            e = datetime.strptime(end, "%Y-%m-%d").date() if end else None
-            if s and d < s: return False
-            if e and d > e: return False
-            return True
-        return FinanceData([r for r in self.records if in_range(r.fecha)])
+        # se recuerda el último filtro: repetirlo devuelve el mismo objeto con sus agregaciones ya memorizadas
+        return self._memo_last("filter_period", (month, start, end), lambda: self._filter_period(month, start, end))
 
+    def _filter_period(self, month: Optional[str], start: Optional[str], end: Optional[str]) -> "FinanceData":
+        # límites parseados una sola vez; el filtro es una máscara sobre las columnas
+        if month:
+            try:
+                mes = np.datetime64(datetime.strptime(month+"-01", "%Y-%m-%d").date(), "M")
+            except Exception:
+                return self
+            return self._take(self.mes == mes)
+        if not start and not end: return self
+        mask = np.ones(len(self), dtype=bool)
+        if start: mask &= self.fecha >= np.datetime64(datetime.strptime(start, "%Y-%m-%d").date(), "D")
+        if end: mask &= self.fecha <= np.datetime64(datetime.strptime(end, "%Y-%m-%d").date(), "D")
+        return self._take(mask)
+
+    def analysis(self, settings: dict) -> Dict[str, any]:
+        """`analyze_finances` memorizado para los últimos ajustes (render y reporte lo comparten)."""
+        return self._memo_last("analyze_finances", json.dumps(settings, sort_keys=True),
+                               lambda: analyze_finances(self, settings))
+
+    def concat(self, other: "FinanceData") -> "FinanceData":
+        """Une dos conjuntos de movimientos, fusionando sus tablas de categorías."""
+        index = {name: i for i, name in enumerate(self.cat_names.tolist())}
+        remap = np.array([index.setdefault(name, len(index)) for name in other.cat_names.tolist()], dtype=np.int32)
+        return FinanceData(
+            fecha=np.concatenate([self.fecha, other.fecha]),
+            tipo=np.concatenate([self.tipo, other.tipo]),
+            cat_codes=np.concatenate([self.cat_codes, remap[other.cat_codes]]),
+            cat_names=np.array(list(index), dtype=object),
+            descripcion=np.concatenate([self.descripcion, other.descripcion]),
+            monto=np.concatenate([self.monto, other.monto]),
+        )
+
+    @_cached
+    def signature(self) -> int:
+        """Hash del contenido que usan las gráficas (no incluye descripciones)."""
+        return hash((self.fecha.tobytes(), self.tipo.tobytes(), self.monto.tobytes(),
+                     self.cat_codes.tobytes(), tuple(self.cat_names.tolist())))
+
+    @_cached
+    def _es_gasto(self) -> np.ndarray:
+        """Máscara booleana de los gastos, compartida por las agregaciones."""
+        return self.tipo == TIPO_GASTO
+
+    def _signed(self) -> np.ndarray:
+        return np.where(self.tipo == TIPO_INGRESO, self.monto, -self.monto)
+
+    @_cached
     def totals(self) -> Tuple[float,float,float]:
-        inc = sum(r.monto for r in self.records if r.tipo == "ingreso")
-        exp = sum(r.monto for r in self.records if r.tipo == "gasto")
+        inc = float(self.monto[self.tipo == TIPO_INGRESO].sum())
+        exp = float(self.monto[self._es_gasto()].sum())
         net = inc - exp
         return inc, exp, net
 
+    @_cached
+    def by_category_expenses_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(nombres, sumas) de gasto por categoría, en orden de primera aparición entre estos gastos."""
+        g = self._es_gasto()
+        codes = self.cat_codes[g]
+        sums = np.bincount(codes, weights=self.monto[g], minlength=len(self.cat_names))
+        # cat_names es compartida con el conjunto completo: el orden sale de las filas filtradas
+        uniq, first = np.unique(codes, return_index=True)
+        present = uniq[np.argsort(first)]
+        return self.cat_names[present], sums[present]
+
+    @_cached
+    def by_category_expenses_sorted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(nombres, sumas) de gasto por categoría, mayor gasto primero."""
+        names, sums = self.by_category_expenses_arrays()
+        # sort estable => empates en orden de primera aparición entre los gastos
+        order = np.argsort(-sums, kind="stable")
+        return names[order], sums[order]
+
+    @_cached
     def by_category_expenses(self) -> Dict[str,float]:
-        d = defaultdict(float)
-        for r in self.records:
-            if r.tipo == "gasto": d[r.categoria] += r.monto
-        return dict(sorted(d.items(), key=lambda kv: -kv[1]))
+        names, sums = self.by_category_expenses_sorted()
+        return dict(zip(names.tolist(), sums.tolist()))
 
+    @_cached
+    def category_expense_values(self) -> Dict[str,np.ndarray]:
+        """Montos de cada gasto agrupados por categoría (orden de aparición), para el boxplot."""
+        g = self._es_gasto()
+        groups = pd.Series(self.monto[g], index=self.cat_codes[g]).groupby(level=0, sort=False)
+        return {self.cat_names[code]: vals.to_numpy() for code, vals in groups}
+
+    @_cached
     def daily_series(self) -> Dict[date,float]:
-        d = defaultdict(float)
-        for r in self.records:
-            d[r.fecha] += r.monto if r.tipo == "ingreso" else -r.monto
-        return dict(sorted(d.items(), key=lambda kv: kv[0]))
+        days, sums = _group_sum(self.fecha, self._signed())
+        return dict(zip(days.tolist(), sums.tolist()))
 
+    @_cached
     def monthly_net_series(self) -> Dict[str,float]:
-        d = defaultdict(float)
-        for r in self.records:
-            k = r.fecha.strftime("%Y-%m")
-            d[k] += r.monto if r.tipo == "ingreso" else -r.monto
-        return dict(sorted(d.items(), key=lambda kv: kv[0]))
+        return {k: v[2] for k, v in self.monthly_inc_exp().items()}
 
+    @_cached
     def monthly_inc_exp(self) -> Dict[str, Tuple[float,float,float]]:
         """Devuelve {YYYY-MM: (ingresos, gastos, neto)}"""
-        inc = defaultdict(float); exp = defaultdict(float)
-        for r in self.records:
-            k = r.fecha.strftime("%Y-%m")
-            if r.tipo == "ingreso": inc[k] += r.monto
-            else: exp[k] += r.monto
-        keys = sorted(set(inc.keys()) | set(exp.keys()))
-        return {k: (inc.get(k,0.0), exp.get(k,0.0), inc.get(k,0.0)-exp.get(k,0.0)) for k in keys}
-
+        months, inv = np.unique(self.mes, return_inverse=True)
+        # una sola agregación: celda (mes, ingreso|gasto)
+        cell = 2*inv + (self.tipo != TIPO_INGRESO)
+        sums = np.bincount(cell, weights=self.monto, minlength=2*len(months)).reshape(-1, 2)
+        inc, exp = sums[:, 0].tolist(), sums[:, 1].tolist()
+        return {k: (i, e, i-e) for k, i, e in zip(months.astype(str).tolist(), inc, exp)}
+
+    @_cached
     def stats(self) -> Dict[str,float]:
         inc, exp, net = self.totals()
         gastos = self.by_category_expenses()
@@ -213,27 +332,185 @@ class FinanceData:
         return {"ingresos":inc,"gastos":exp,"neto":net,"top":top_cat,"top_val":top_val,"ahorro_pct":ahorro_pct}
 
 # Helpers formato y análisis
+_USD_POS = "${:,.2f}".format
+_USD_NEG = "-${:,.2f}".format
+
+# los ticks se repiten entre redibujados: se memoriza el texto por valor (ignorando la posición)
+@functools.lru_cache(maxsize=1024)
+def _usd_text(x: float) -> str:
+    return (_USD_NEG if x < 0 else _USD_POS)(abs(x))
+
+@functools.lru_cache(maxsize=256)
+def _pct_text(x: float) -> str:
+    return f"{x:.0f}%"
+
 def usd_fmt(x, _pos=None):
-    sign = "-" if x < 0 else ""
-    v = abs(x)
-    return f"{sign}${v:,.2f}"
+    return _usd_text(x)
 
 def pct_fmt(x, _pos=None):
-    return f"{x:.0f}%"
+    return _pct_text(x)
 
-def group_top_n(d: Dict[str,float], n=6) -> Dict[str,float]:
-    if len(d) <= n: return d
-    items = list(d.items())
-    top = items[:n]; rest = items[n:]
-    out = dict(top); out["Otros"] = sum(v for _,v in rest); return out
+# formateadores de eje compartidos por todas las gráficas (sin estado propio)
+USD_FORMATTER = FuncFormatter(usd_fmt)
+PCT_FORMATTER = FuncFormatter(pct_fmt)
 
-def moving_average(seq: List[float], w: int) -> List[float]:
-    w = max(1, int(w))
-    out=[]; q=deque(maxlen=w); s=0.0
-    for v in seq:
-        q.append(v); s = sum(q); out.append(s/len(q))
+def group_top_n(names: np.ndarray, sums: np.ndarray, n=6) -> Dict[str,float]:
+    """Top `n` categorías y el resto agrupado en "Otros".
+
+    `names`/`sums` ya vienen de mayor a menor (`FinanceData.by_category_expenses_sorted`, el mismo orden del Pareto)."""
+    out = dict(zip(names[:n].tolist(), sums[:n].tolist()))
+    if sums.size > n: out["Otros"] = float(sums[n:].sum())
     return out
 
+def moving_average(seq: List[float], w: int) -> np.ndarray:
+    """Media móvil de ventana `w` (la ventana crece al inicio). Suma deslizante: O(N)."""
+    w = max(1, int(w))
+    v = np.asarray(seq, dtype=np.float64)
+    s = np.cumsum(v)
+    s[w:] = s[w:] - s[:-w]
+    return s / np.minimum(np.arange(1, v.size+1), w)
+
+def column_envelope(vals: List[float], n_cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Reduce la serie a `n_cols` cubetas contiguas: (índice final, mínimo, máximo, media) de cada una."""
+    v = np.asarray(vals, dtype=np.float64)
+    idx = np.linspace(0, v.size, n_cols+1, dtype=int)
+    starts = idx[:-1]
+    return (idx[1:]-1, np.minimum.reduceat(v, starts), np.maximum.reduceat(v, starts),
+            np.add.reduceat(v, starts)/np.diff(idx))
+
+# zlib nivel 1: codifica varias veces más rápido a cambio de archivos algo mayores;
+# sin bbox_inches="tight" (segundo dibujado): los márgenes ya los fija tight_layout al renderizar
+# sin metadatos (Software / fecha de creación): menos trozos que codificar por archivo
+PNG_SAVE_KW = {"dpi": 150, "pil_kwargs": {"compress_level": 1}, "metadata": {"Software": None}}
+PDF_METADATA = {"Creator": None, "Producer": None, "CreationDate": None}
+
+def figure_png_bytes(fig: Figure) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", **PNG_SAVE_KW)
+    return buf.getvalue()
+
+# Gráficas: dibujan sobre cualquier Figure (pestañas en pantalla y exportación en segundo plano)
+def plot_barras(fig: Figure, inc: float, exp: float, net: float, suf: str):
+    """Devuelve (ax, barras, línea del neto, etiquetas, leyenda) para el blitting de la pestaña."""
+    ax = fig.add_subplot(111)
+    ax.set_title(f"Ingresos vs Gastos{suf}")
+    rects = ax.bar(["Ingresos", "Gastos"], [inc, exp], color=[PALETTE["inc"], PALETTE["exp"]], alpha=0.9)
+    ax.axhline(0, color="#888888", linewidth=0.8)
+    net_line, = ax.plot([-0.3, 1.3], [net, net], color=PALETTE["net"], linewidth=2, linestyle="--", label=f"Neto: {usd_fmt(net)}")
+    ax.yaxis.set_major_formatter(USD_FORMATTER)
+    ax.yaxis.set_major_locator(MaxNLocator(nbins=6, prune="lower"))
+    ax.grid(axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
+    labels = ax.bar_label(rects, labels=[usd_fmt(v) for v in (inc, exp)], padding=6, fontsize=11, fontweight="bold")
+    legend = ax.legend(loc="upper right")
+    fig.tight_layout()
+    return ax, rects, net_line, labels, legend
+
+def plot_pie(fig: Figure, gastos_cat: Dict[str,float], suf: str):
+    ax = fig.add_subplot(111)
+    ax.set_title(f"Gastos por categoría (Top N){suf}")
+    if not gastos_cat:
+        ax.text(0.5, 0.5, "No hay datos de gastos", ha="center", va="center", fontsize=12)
+    else:
+        labels = list(gastos_cat.keys()); sizes = list(gastos_cat.values())
+        wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct=lambda p: f"{p:.1f}%",
+                                          startangle=90, pctdistance=0.75)
+        for at in autotexts: at.set_fontweight("bold")
+        ax.axis("equal")
+    fig.tight_layout()
+
+def plot_dona(fig: Figure, gastos_cat: Dict[str,float], suf: str):
+    ax = fig.add_subplot(111)
+    ax.set_title(f"Dona — Gastos por categoría (Top N){suf}")
+    if not gastos_cat:
+        ax.text(0.5, 0.5, "No hay datos de gastos", ha="center", va="center", fontsize=12)
+    else:
+        labels = list(gastos_cat.keys()); sizes = list(gastos_cat.values())
+        ax.pie(sizes, labels=labels, autopct=lambda p: f"{p:.1f}%", startangle=90, pctdistance=0.78)
+        centre = Circle((0,0), 0.55, fc="white")
+        ax.add_artist(centre); ax.axis("equal")
+    fig.tight_layout()
+
+def plot_flujo(fig: Figure, daily: Dict[date,float], suf: str, window: int=5):
+    ax = fig.add_subplot(111)
+    ax.set_title(f"Flujo diario + Media móvil ({window}) + Acumulado{suf}")
+    if not daily:
+        ax.text(0.5, 0.5, "No hay serie diaria", ha="center", va="center", fontsize=12)
+    else:
+        days = np.array(list(daily.keys()), dtype="datetime64[D]")
+        vals = np.fromiter(daily.values(), dtype=np.float64, count=len(daily))
+        acc = np.cumsum(vals)
+        mv = moving_average(vals, window)
+        n_cols = max(1, int(ax.bbox.width))
+        if len(days) > 2*n_cols:
+            # serie más densa que los píxeles: envolvente min/max por columna + media
+            ends, lo, hi, mean = column_envelope(vals, n_cols)
+            days, mv, acc = days[ends], mv[ends], acc[ends]
+            ax.fill_between(days, lo, hi, color=PALETTE["accent"], alpha=0.25, linewidth=0)
+            vals = mean
+        ax.plot(days, vals, label="Flujo diario", color=PALETTE["accent"], linewidth=1.8)
+        ax.plot(days, mv, label="Media móvil", color=PALETTE["inc"], linestyle="--", linewidth=2.2)
+        ax.plot(days, acc, label="Acumulado", color=PALETTE["net"], linestyle=":", linewidth=2.2)
+        ax.yaxis.set_major_formatter(USD_FORMATTER)
+        ax.grid(True, linestyle="--", color=PALETTE["grid"], alpha=0.7)
+        ax.legend(loc="best"); fig.autofmt_xdate()
+    fig.tight_layout()
+
+def plot_waterfall(fig: Figure, monthly_net: Dict[str,float], suf: str):
+    ax = fig.add_subplot(111)
+    ax.set_title(f"Waterfall del neto mensual{suf}")
+    if not monthly_net:
+        ax.text(0.5, 0.5, "No hay datos mensuales", ha="center", va="center", fontsize=12)
+    else:
+        keys = list(monthly_net.keys())
+        vals = np.fromiter(monthly_net.values(), dtype=np.float64, count=len(keys))
+        # cada barra parte del saldo acumulado antes del mes; altura con signo (los negativos bajan)
+        running = np.cumsum(vals) - vals
+        colors = np.where(vals >= 0, PALETTE["inc"], PALETTE["exp"]).tolist()
+        bars = ax.bar(keys, vals, bottom=running, color=colors, alpha=0.9)
+        # etiqueta en el extremo de la barra (saldo tras el mes)
+        ax.bar_label(bars, labels=[f"{v:+,.2f}" for v in vals.tolist()], padding=3, fontsize=10, fontweight="bold")
+        ax.yaxis.set_major_formatter(USD_FORMATTER)
+        ax.grid(axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
+    fig.tight_layout()
+
+def plot_boxplot(fig: Figure, cat_map: Dict[str,np.ndarray], suf: str):
+    """`cat_map`: montos de gasto por categoría (`FinanceData.category_expense_values`)."""
+    ax = fig.add_subplot(111)
+    ax.set_title(f"Distribución de gastos por categoría (boxplot){suf}")
+    if not cat_map:
+        ax.text(0.5, 0.5, "No hay gastos", ha="center", va="center", fontsize=12)
+    else:
+        labels = list(cat_map.keys()); values = [cat_map[k] for k in labels]
+        bp = ax.boxplot(values, labels=labels, showmeans=True, meanline=True)
+        # resaltar media (verde) y mediana (azul)
+        for med in bp["medians"]:
+            med.set_color(PALETTE["net"]); med.set_linewidth(2.2)
+        for mean in bp["means"]:
+            mean.set_color(PALETTE["inc"]); mean.set_linewidth(2.0)
+        ax.yaxis.set_major_formatter(USD_FORMATTER)
+        ax.grid(True, axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
+    fig.tight_layout()
+
+def plot_pareto(fig: Figure, names: np.ndarray, vals: np.ndarray, suf: str):
+    """`names`/`vals`: gasto por categoría ya ordenado de mayor a menor."""
+    ax = fig.add_subplot(111)
+    ax.set_title(f"Pareto de gastos por categoría{suf}")
+    if vals.size == 0:
+        ax.text(0.5, 0.5, "No hay datos de gastos", ha="center", va="center", fontsize=12)
+    else:
+        cats = names.tolist()
+        total = float(vals.sum())
+        if total == 0.0: total = 1.0
+        cum = np.cumsum(vals) * (100.0/total)
+        bars = ax.bar(cats, vals, color=PALETTE["exp"], alpha=0.9)
+        ax2 = ax.twinx(); ax2.plot(cats, cum, marker="o", color=PALETTE["net"], linewidth=2.0)
+        ax.set_ylabel("USD"); ax2.set_ylabel("Acumulado (%)")
+        ax.yaxis.set_major_formatter(USD_FORMATTER)
+        ax2.yaxis.set_major_formatter(PCT_FORMATTER); ax2.set_ylim(0, 110)
+        ax.grid(axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
+        ax.bar_label(bars, labels=[usd_fmt(v) for v in vals.tolist()], padding=3, fontsize=10, fontweight="bold")
+    fig.tight_layout()
+
 def analyze_finances(fd: FinanceData, settings: dict) -> Dict[str, any]:
     """Cálculos adicionales para el reporte/alertas."""
     inc, exp, net = fd.totals()
@@ -309,9 +586,58 @@ def analyze_finances(fd: FinanceData, settings: dict) -> Dict[str, any]:
         "break_even": break_even,
         "alertas": [a for a in [growth_alert] if a] + alertas,
         "recomendaciones": recomendaciones,
-        "top3_gastos": list(fd.by_category_expenses().items())[:3],
+        "top3_gastos": list(gastos_cat.items())[:3],
     }
 
+@dataclass
+class AnalysisBundle:
+    """Todo lo derivado de un FinanceData que consumen los KPIs, las gráficas y el reporte."""
+    inc: float
+    exp: float
+    net: float
+    gastos_sorted: Tuple[np.ndarray, np.ndarray]   # (nombres, sumas) de mayor a menor, para el Pareto
+    gastos_top: Dict[str,float]   # top N + "Otros" para pie/dona
+    daily: Dict[date,float]
+    monthly: Dict[str,float]
+    stats: Dict[str,float]
+    deep: Dict[str, any]
+
+def compute_all(fd: FinanceData, settings: dict) -> AnalysisBundle:
+    """Calcula cada agregación una sola vez (FinanceData las memoriza) y las agrupa."""
+    inc, exp, net = fd.totals()
+    return AnalysisBundle(inc=inc, exp=exp, net=net,
+                          gastos_sorted=fd.by_category_expenses_sorted(),
+                          gastos_top=group_top_n(*fd.by_category_expenses_sorted()),
+                          daily=fd.daily_series(),
+                          monthly=fd.monthly_net_series(),
+                          stats=fd.stats(),
+                          deep=fd.analysis(settings))
+
+# Plantilla del reporte; los bloques opcionales llegan ya formateados (vacíos si no aplican)
+_REPORTE_MD = textwrap.dedent("""\
+    # Reporte Finanzas {period}
+
+    ## KPIs
+    - **Ingresos:** {inc}
+    - **Gastos:** {exp}
+    - **Neto:** {net}
+    - **Ahorro (sobre ingresos):** {ahorro:.2f}%
+    {runway}
+    ## Análisis
+    {top3}- **Objetivo de ahorro:** {obj:.1f}% | **Real:** {real:.1f}% | **Brecha:** {brecha:.1f} pts
+    - **Break-even aproximado:** ingresos ≥ {break_even}
+    {alertas}{recomendaciones}
+    ## Gráficas recomendadas (si exportaste)
+    - 01_barras_ingresos_gastos*.png
+    - 02_pie_gastos*.png
+    - 03_dona_gastos*.png
+    - 04_linea_flujo*.png
+    - 05_waterfall_mensual*.png
+    - 06_boxplot_gastos*.png
+    - 07_pareto_gastos*.png
+
+    > Generado por Finanzas GUI PRO+MD""")
+
 # App GUI
 class FinanceApp(tk.Tk):
     def __init__(self):
@@ -322,7 +648,11 @@ class FinanceApp(tk.Tk):
 
         self.csv_path = DEFAULT_CSV
         ensure_csv(self.csv_path)
-        self.fd_all = FinanceData.from_rows(read_csv_file(self.csv_path))
+        self._csv_state = None   # (archivo, bytes leídos, cabecera, mtime_ns) justo tras la última carga
+        self.fd_all = FinanceData()
+        try: self._load_csv()
+        except Exception as e:
+            messagebox.showerror("Abrir CSV", f"No se pudo leer {os.path.abspath(self.csv_path)}:\n{e}")
         self.filtered = self.fd_all
 
         self.settings = read_settings()
@@ -387,7 +717,10 @@ class FinanceApp(tk.Tk):
     # Tabs
     def _build_notebook(self):
         self.nb = ttk.Notebook(self); self.nb.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=(0,10))
-        self.tabs = {}
+        self.tabs = {}; self._tab_keys = []
+        self._render_sig = {}   # pestaña -> firma de los datos con que se dibujó
+        self._plots = {}        # pestaña -> (función de dibujo, argumentos) del último render
+        self._blit = {}         # pestaña -> artistas animados + fondo capturado (actualización por blitting)
         for key, title in [
             ("barras", "Barras: Ingresos vs Gastos"),
             ("pie", "Pie: Gastos por Categoría (Top N)"),
@@ -398,7 +731,14 @@ class FinanceApp(tk.Tk):
             ("pareto", "Pareto: Gastos por Categoría"),
         ]:
             frame = ttk.Frame(self.nb); self.nb.add(frame, text=title)
-            self.tabs[key] = {"frame": frame, "figure": None, "canvas": None}
+            # figura y canvas persistentes: cada render limpia y redibuja sobre ellos
+            fig = Figure(figsize=(9.6,5.4), dpi=100)
+            canvas = FigureCanvasTkAgg(fig, master=frame)
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            canvas.mpl_connect("draw_event", lambda ev, key=key: self._on_tab_draw(key, ev))
+            self.tabs[key] = {"frame": frame, "figure": fig, "canvas": canvas}; self._tab_keys.append(key)
+        self._visible_tab = self._tab_keys[0]
+        self.nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
     # Status
     def _build_status(self):
@@ -421,15 +761,25 @@ class FinanceApp(tk.Tk):
     def on_open_csv(self):
         p = filedialog.askopenfilename(title="Abrir CSV", filetypes=[("CSV", "*.csv"), ("Todos", "*.*")])
         if not p: return
-        self.csv_path = p; self.csv_label.config(text=f"CSV: {os.path.abspath(self.csv_path)}")
-        self._reload()
+        # la ruta nueva solo se adopta si carga bien; si no, se sigue con el CSV anterior
+        old = (self.csv_path, self._csv_state)
+        self.csv_path = p; self._csv_state = None
+        try: self._load_csv()
+        except Exception as e:
+            self.csv_path, self._csv_state = old
+            messagebox.showerror("Abrir CSV", f"No se pudo leer el CSV:\n{e}"); return
+        self.csv_label.config(text=f"CSV: {os.path.abspath(self.csv_path)}")
+        self.apply_filters()
 
     def on_import_csv(self):
         p = filedialog.askopenfilename(title="Importar CSV", filetypes=[("CSV", "*.csv"), ("Todos", "*.*")])
         if not p: return
-        n = import_csv(self.csv_path, p)
+        appended = self._csv_unchanged()
+        try: n = import_csv(self.csv_path, p)
+        except Exception as e:
+            messagebox.showerror("Importación", f"No se pudo leer el CSV:\n{e}"); return
         messagebox.showinfo("Importación", f"Importados {n} registros.")
-        self._reload()
+        self._reload(appended)
 
     def on_add(self, tipo: str):
         try:
@@ -447,8 +797,9 @@ class FinanceApp(tk.Tk):
                     descripcion = e_desc.get().strip()
                     monto = float(e_monto.get().strip())
                     if monto <= 0: raise ValueError("Monto debe ser > 0")
+                    appended = self._csv_unchanged()
                     append_row(self.csv_path, {"fecha":str(fecha),"tipo":tipo,"categoria":categoria,"descripcion":descripcion,"monto":monto})
-                    top.destroy(); self._reload()
+                    top.destroy(); self._reload(appended)
                 except Exception as ex:
                     messagebox.showerror("Dato inválido", f"Revisa los campos.\n\n{ex}")
             ttk.Button(frm, text="Guardar", command=ok).grid(row=4, column=0, pady=(10,0))
@@ -457,7 +808,7 @@ class FinanceApp(tk.Tk):
             messagebox.showerror("Error", str(e))
 
     def on_settings(self):
-        cfg = read_settings()
+        cfg = dict(self.settings)   # se lee una vez al arrancar; aquí solo se edita una copia
         top = tk.Toplevel(self); top.title("Ajustes financieros"); top.grab_set()
         frm = ttk.Frame(top, padding=10); frm.pack(fill=tk.BOTH, expand=True)
         ttk.Label(frm, text="Saldo inicial (para runway):").grid(row=0, column=0, sticky="w"); e_saldo = ttk.Entry(frm); e_saldo.grid(row=0, column=1, sticky="ew"); e_saldo.insert(0, str(cfg.get("saldo_inicial",0.0)))
@@ -478,9 +829,39 @@ class FinanceApp(tk.Tk):
         ttk.Button(frm, text="Guardar ajustes", command=guardar).grid(row=4, column=0, pady=(10,0))
         ttk.Button(frm, text="Cerrar", command=top.destroy).grid(row=4, column=1, pady=(10,0), sticky="e")
 
-    def _reload(self):
-        rows = read_csv_file(self.csv_path)
-        self.fd_all = FinanceData.from_rows(rows)
+    def _csv_unchanged(self) -> bool:
+        """True si el CSV sigue tal como quedó tras la última carga (mismo archivo, tamaño y mtime)."""
+        if not self._csv_state: return False
+        try: st = os.stat(self.csv_path)
+        except OSError: return False
+        ident, pos, _, mtime = self._csv_state
+        return ident == (os.path.abspath(self.csv_path), st.st_dev, st.st_ino) and (st.st_size, st.st_mtime_ns) == (pos, mtime)
+
+    def _load_csv(self, appended: bool=False):
+        """Carga el CSV completo. Con `appended` (la app solo añadió filas a un archivo que no
+        había cambiado desde la última carga, ver `_csv_unchanged`) parsea únicamente la cola."""
+        ensure_csv(self.csv_path)
+        if appended and self._csv_state:
+            ident, pos, header, _ = self._csv_state
+            with open(self.csv_path, "rb") as f:
+                same_header = f.readline() == header
+                f.seek(pos-1); tail = f.read(); st = os.fstat(f.fileno())
+            if same_header and tail[:1] == b"\n":
+                if len(tail) > 1:
+                    new = FinanceData.from_frame(_read_csv_frame(io.BytesIO(header + tail[1:])))
+                    self.fd_all = self.fd_all.concat(new)
+                self._csv_state = (ident, pos + len(tail) - 1, header, st.st_mtime_ns)
+                return
+        with open(self.csv_path, "rb") as f:
+            data = f.read(); st = os.fstat(f.fileno())
+        self.fd_all = FinanceData.from_frame(_read_csv_frame(io.BytesIO(data)))
+        ident = (os.path.abspath(self.csv_path), st.st_dev, st.st_ino)
+        self._csv_state = (ident, len(data), data.split(b"\n", 1)[0] + b"\n", st.st_mtime_ns)
+
+    def _reload(self, appended: bool=False):
+        try: self._load_csv(appended)
+        except Exception as e:
+            messagebox.showerror("Abrir CSV", f"No se pudo leer el CSV:\n{e}"); return
         self.apply_filters()
 
     def apply_filters(self):
@@ -495,15 +876,12 @@ class FinanceApp(tk.Tk):
     # Render
     def render_all(self):
         try:
-            inc, exp, net = self.filtered.totals()
-            gastos_cat = self.filtered.by_category_expenses()
-            daily = self.filtered.daily_series()
-            monthly = self.filtered.monthly_net_series()
+            b = compute_all(self.filtered, self.settings)
+            inc, exp, net = b.inc, b.exp, b.net
             suf = self._suffix()
 
             # análisis
-            st = self.filtered.stats()
-            deep = analyze_finances(self.filtered, self.settings)
+            st = b.stats; deep = b.deep
             consejo = "✅ Positivo, separa 10–20% a emergencia." if st["neto"]>=0 else "⚠️ Déficit, ajusta categoría principal."
             extra = []
             if deep["runway_meses"] is not None:
@@ -517,14 +895,21 @@ class FinanceApp(tk.Tk):
                 + (" · ".join(extra))
             ))
 
-            # Gráficas
-            self._render_barras(inc, exp, net, suf)
-            self._render_pie(group_top_n(gastos_cat), suf)
-            self._render_dona(group_top_n(gastos_cat), suf)
-            self._render_flujo(daily, suf, window=self.mov_win.get())
-            self._render_waterfall(monthly, suf)
-            self._render_boxplot(self.filtered, suf)
-            self._render_pareto(gastos_cat, suf)
+            # Gráficas (solo las pestañas cuyos datos cambiaron desde el último dibujo)
+            sig = (self.filtered.signature(), suf)
+            window = self.mov_win.get()
+            for key, tab_sig, render in [
+                ("barras", sig, lambda: self._update_barras(inc, exp, net, suf) or self._render_barras(inc, exp, net, suf)),
+                ("pie", sig, lambda: self._render_tab("pie", plot_pie, b.gastos_top, suf)),
+                ("dona", sig, lambda: self._render_tab("dona", plot_dona, b.gastos_top, suf)),
+                ("flujo", sig + (window,), lambda: self._render_tab("flujo", plot_flujo, b.daily, suf, window)),
+                ("waterfall", sig, lambda: self._render_tab("waterfall", plot_waterfall, b.monthly, suf)),
+                ("box", sig, lambda: self._render_tab("box", plot_boxplot, self.filtered.category_expense_values(), suf)),
+                ("pareto", sig, lambda: self._render_tab("pareto", plot_pareto, *b.gastos_sorted, suf)),
+            ]:
+                if self._render_sig.get(key) != tab_sig:
+                    render(); self._render_sig[key] = tab_sig
+                    if key != self._visible_tab: self._release_renderer(key)   # tight_layout lo creó
 
             # alertas en status
             alerts = deep["alertas"]
@@ -537,12 +922,47 @@ class FinanceApp(tk.Tk):
 
     def _prepare_tab(self, key: str):
         tab = self.tabs[key]
-        for child in tab["frame"].winfo_children(): child.destroy()
-        fig = plt.Figure(figsize=(9.6,5.4), dpi=100)
-        canvas = FigureCanvasTkAgg(fig, master=tab["frame"])
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        tab["figure"] = fig; tab["canvas"] = canvas
-        return fig, canvas
+        fig = tab["figure"]; fig.clear(); self._blit.pop(key, None)
+        return fig, tab["canvas"]
+
+    def _draw_tab(self, canvas):
+        """Dibuja solo la pestaña visible; las ocultas se dibujan al mostrarse (`_on_tab_changed`)."""
+        if canvas is self.tabs[self._visible_tab]["canvas"]: canvas.draw_idle()
+
+    def _release_renderer(self, key: str):
+        """Libera el buffer Agg (ancho×alto×4 bytes) de una pestaña oculta; get_renderer() lo recrea al dibujar."""
+        canvas = self.tabs[key]["canvas"]
+        # usa internos de FigureCanvasAgg.get_renderer (renderer/_lastKey), estables en matplotlib 3.x:
+        # con otra versión o un canvas que lo redefina no se libera nada (solo se pierde el ahorro de memoria).
+        # Las exportaciones dibujan en figuras propias (_map_figures), nunca sobre este canvas.
+        if not _AGG_RENDERER_RELEASABLE or type(canvas).get_renderer is not FigureCanvasAgg.get_renderer: return
+        canvas.renderer = None; canvas._lastKey = None
+        if key in self._blit: self._blit[key]["bg"] = None
+
+    def _on_tab_changed(self, _event=None):
+        self._visible_tab = self._tab_keys[self.nb.index("current")]
+        for key in self._tab_keys:
+            if key != self._visible_tab: self._release_renderer(key)
+        self.tabs[self._visible_tab]["canvas"].draw_idle()
+
+    def _on_tab_draw(self, key: str, ev):
+        """Tras cada dibujado completo: guarda el fondo sin los artistas animados y los pinta encima."""
+        st = self._blit.get(key)
+        canvas = self.tabs[key]["canvas"]
+        # el callback es de la figura: ignora dibujados de otro canvas (p. ej. PDF) o de un guardado
+        if not st or ev.canvas is not canvas or ev.canvas.is_saving(): return
+        fig = self.tabs[key]["figure"]
+        st["bg"] = canvas.copy_from_bbox(fig.bbox)
+        for a in st["artists"](): fig.draw_artist(a)
+
+    def _blit_tab(self, key: str):
+        st = self._blit[key]; tab = self.tabs[key]
+        canvas, fig = tab["canvas"], tab["figure"]
+        if st.get("bg") is None:
+            self._draw_tab(canvas); return   # aún sin fondo: el próximo dibujado completo lo captura
+        canvas.restore_region(st["bg"])
+        for a in st["artists"](): fig.draw_artist(a)
+        canvas.blit(fig.bbox)
 
     def _suffix(self):
         m = self.period_var.get()
@@ -551,124 +971,41 @@ class FinanceApp(tk.Tk):
         return " (Todo)"
 
     # Gráficas
+    def _render_tab(self, key: str, plot, *args):
+        """Dibuja `plot(fig, *args)` en la pestaña y lo recuerda para exportar (los datos son inmutables)."""
+        fig, canvas = self._prepare_tab(key)
+        out = plot(fig, *args); self._plots[key] = (plot, args)
+        self._draw_tab(canvas)
+        return out
+
     def _render_barras(self, inc: float, exp: float, net: float, suf: str):
         fig, canvas = self._prepare_tab("barras")
-        ax = fig.add_subplot(111)
-        ax.set_title(f"Ingresos vs Gastos{suf}")
-        rects = ax.bar(["Ingresos", "Gastos"], [inc, exp], color=[PALETTE["inc"], PALETTE["exp"]], alpha=0.9)
-        ax.axhline(0, color="#888888", linewidth=0.8)
-        ax.plot([-0.3, 1.3], [net, net], color=PALETTE["net"], linewidth=2, linestyle="--", label=f"Neto: {usd_fmt(net)}")
-        ax.yaxis.set_major_formatter(FuncFormatter(usd_fmt))
-        ax.yaxis.set_major_locator(MaxNLocator(nbins=6, prune="lower"))
-        ax.grid(axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
-        for r, val in zip(rects, [inc, exp]):
-            ax.annotate(usd_fmt(val), (r.get_x()+r.get_width()/2, r.get_height()),
-                        xytext=(0, 6), textcoords="offset points", ha="center", va="bottom", fontsize=11, weight="bold")
-        ax.legend(loc="upper right")
-        fig.tight_layout(); canvas.draw()
-
-    def _render_pie(self, gastos_cat: Dict[str,float], suf: str):
-        fig, canvas = self._prepare_tab("pie"); ax = fig.add_subplot(111)
-        ax.set_title(f"Gastos por categoría (Top N){suf}")
-        if not gastos_cat:
-            ax.text(0.5, 0.5, "No hay datos de gastos", ha="center", va="center", fontsize=12)
-        else:
-            labels = list(gastos_cat.keys()); sizes = list(gastos_cat.values())
-            wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct=lambda p: f"{p:.1f}%",
-                                              startangle=90, pctdistance=0.75)
-            for at in autotexts: at.set_fontweight("bold")
-            ax.axis("equal")
-        fig.tight_layout(); canvas.draw()
-
-    def _render_dona(self, gastos_cat: Dict[str,float], suf: str):
-        fig, canvas = self._prepare_tab("dona"); ax = fig.add_subplot(111)
-        ax.set_title(f"Dona — Gastos por categoría (Top N){suf}")
-        if not gastos_cat:
-            ax.text(0.5, 0.5, "No hay datos de gastos", ha="center", va="center", fontsize=12)
-        else:
-            labels = list(gastos_cat.keys()); sizes = list(gastos_cat.values())
-            ax.pie(sizes, labels=labels, autopct=lambda p: f"{p:.1f}%", startangle=90, pctdistance=0.78)
-            centre = plt.Circle((0,0), 0.55, fc="white")
-            ax.add_artist(centre); ax.axis("equal")
-        fig.tight_layout(); canvas.draw()
-
-    def _render_flujo(self, daily: Dict[date,float], suf: str, window: int=5):
-        fig, canvas = self._prepare_tab("flujo"); ax = fig.add_subplot(111)
-        ax.set_title(f"Flujo diario + Media móvil ({window}) + Acumulado{suf}")
-        if not daily:
-            ax.text(0.5, 0.5, "No hay serie diaria", ha="center", va="center", fontsize=12)
-        else:
-            days = list(daily.keys()); vals = [daily[d] for d in days]
-            acc, s = [], 0.0
-            for v in vals: s += v; acc.append(s)
-            mv = moving_average(vals, window)
-            ax.plot(days, vals, label="Flujo diario", color=PALETTE["accent"], linewidth=1.8)
-            ax.plot(days, mv, label="Media móvil", color=PALETTE["inc"], linestyle="--", linewidth=2.2)
-            ax.plot(days, acc, label="Acumulado", color=PALETTE["net"], linestyle=":", linewidth=2.2)
-            ax.yaxis.set_major_formatter(FuncFormatter(usd_fmt))
-            ax.grid(True, linestyle="--", color=PALETTE["grid"], alpha=0.7)
-            ax.legend(loc="best"); fig.autofmt_xdate()
-        fig.tight_layout(); canvas.draw()
-
-    def _render_waterfall(self, monthly_net: Dict[str,float], suf: str):
-        fig, canvas = self._prepare_tab("waterfall"); ax = fig.add_subplot(111)
-        ax.set_title(f"Waterfall del neto mensual{suf}")
-        if not monthly_net:
-            ax.text(0.5, 0.5, "No hay datos mensuales", ha="center", va="center", fontsize=12)
-        else:
-            keys = list(monthly_net.keys()); vals = [monthly_net[k] for k in keys]
-            running = 0.0; bottoms = []; heights = []; colors = []; ymax = 0.0
-            for v in vals:
-                if v >= 0: bottoms.append(running); heights.append(v); running += v; colors.append(PALETTE["inc"])
-                else:      bottoms.append(running+v); heights.append(-v); running += v; colors.append(PALETTE["exp"])
-                ymax = max(ymax, abs(v))
-            bars = ax.bar(keys, heights, bottom=bottoms, color=colors, alpha=0.9)
-            for i, (k, v) in enumerate(zip(keys, vals)):
-                y = bottoms[i] + (heights[i] if v >= 0 else 0)
-                ax.text(i, y + max(1.0, ymax)*0.02, f"{v:+,.2f}", ha="center", va="bottom", fontsize=10, weight="bold")
-            ax.yaxis.set_major_formatter(FuncFormatter(usd_fmt))
-            ax.grid(axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
-        fig.tight_layout(); canvas.draw()
-
-    def _render_boxplot(self, data: FinanceData, suf: str):
-        fig, canvas = self._prepare_tab("box"); ax = fig.add_subplot(111)
-        ax.set_title(f"Distribución de gastos por categoría (boxplot){suf}")
-        cat_map = defaultdict(list)
-        for r in data.records:
-            if r.tipo=="gasto": cat_map[r.categoria].append(r.monto)
-        if not cat_map:
-            ax.text(0.5, 0.5, "No hay gastos", ha="center", va="center", fontsize=12)
-        else:
-            labels = list(cat_map.keys()); values = [cat_map[k] for k in labels]
-            bp = ax.boxplot(values, labels=labels, showmeans=True, meanline=True)
-            # resaltar media (verde) y mediana (azul)
-            for med in bp["medians"]:
-                med.set_color(PALETTE["net"]); med.set_linewidth(2.2)
-            for mean in bp["means"]:
-                mean.set_color(PALETTE["inc"]); mean.set_linewidth(2.0)
-            ax.yaxis.set_major_formatter(FuncFormatter(usd_fmt))
-            ax.grid(True, axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
-        fig.tight_layout(); canvas.draw()
-
-    def _render_pareto(self, gastos_cat: Dict[str,float], suf: str):
-        fig, canvas = self._prepare_tab("pareto"); ax = fig.add_subplot(111)
-        ax.set_title(f"Pareto de gastos por categoría{suf}")
-        if not gastos_cat:
-            ax.text(0.5, 0.5, "No hay datos de gastos", ha="center", va="center", fontsize=12)
-        else:
-            items = list(gastos_cat.items()); cats = [k for k,_ in items]; vals = [v for _,v in items]
-            total = sum(vals) or 1.0
-            cum, s = [], 0.0
-            for v in vals: s += v; cum.append(100.0*s/total)
-            ax.bar(cats, vals, color=PALETTE["exp"], alpha=0.9)
-            ax2 = ax.twinx(); ax2.plot(cats, cum, marker="o", color=PALETTE["net"], linewidth=2.0)
-            ax.set_ylabel("USD"); ax2.set_ylabel("Acumulado (%)")
-            ax.yaxis.set_major_formatter(FuncFormatter(usd_fmt))
-            ax2.yaxis.set_major_formatter(FuncFormatter(pct_fmt)); ax2.set_ylim(0, 110)
-            ax.grid(axis="y", linestyle="--", color=PALETTE["grid"], alpha=0.7)
-            for i, v in enumerate(vals):
-                ax.text(i, v + max(1.0, max(vals))*0.02, f"{usd_fmt(v)}", ha="center", va="bottom", fontsize=10, weight="bold")
-        fig.tight_layout(); canvas.draw()
+        ax, rects, net_line, labels, legend = plot_barras(fig, inc, exp, net, suf)
+        self._plots["barras"] = (plot_barras, (inc, exp, net, suf))
+        # barras, neto y etiquetas se animan: si solo cambian los montos se actualizan por blitting
+        st = self._blit["barras"] = {"ax": ax, "rects": rects, "line": net_line, "legend": legend, "labels": labels,
+                                     "suf": suf, "bg": None}
+        st["artists"] = lambda: [*st["rects"], st["line"], *st["labels"], st["legend"]]
+        for a in st["artists"](): a.set_animated(True)
+        self._draw_tab(canvas)
+
+    def _update_barras(self, inc: float, exp: float, net: float, suf: str) -> bool:
+        """Actualiza montos sin redibujar ejes ni textos; False si hace falta un render completo."""
+        st = self._blit.get("barras")
+        if not st or st["suf"] != suf: return False
+        lo, hi = st["ax"].get_ylim()
+        top = max(inc, exp, net)
+        if top > hi or top < 0.5*hi or min(0.0, net) < lo: return False   # la escala cambiaría
+        for r, h in zip(st["rects"], (inc, exp)): r.set_height(h)
+        st["line"].set_ydata([net, net])
+        st["legend"].get_texts()[0].set_text(f"Neto: {usd_fmt(net)}")
+        for t in st["labels"]: t.remove()
+        st["labels"] = st["ax"].bar_label(st["rects"], labels=[usd_fmt(v) for v in (inc, exp)],
+                                          padding=6, fontsize=11, fontweight="bold")
+        for t in st["labels"]: t.set_animated(True)
+        self._plots["barras"] = (plot_barras, (inc, exp, net, suf))
+        self._blit_tab("barras")
+        return True
 
     # Reporte Markdown
     def on_report_md(self):
@@ -678,69 +1015,41 @@ class FinanceApp(tk.Tk):
                                             initialdir=os.path.abspath(REPORTS_DIR),
                                             initialfile=f"reporte_finanzas{self._suffix().replace(' ','_')}.md")
         if not path: return
-        try:
-            content = self._build_markdown_report()
+        try: content = self._build_markdown_report()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo generar el reporte:\n{e}"); return
+        def write():
             with open(path, "w", encoding="utf-8") as f: f.write(content)
+        def done(_):
             self.status(f"Reporte MD guardado: {path}")
             if messagebox.askyesno("Reporte guardado", "¿Abrir el archivo?"):
                 webbrowser.open(f"file://{os.path.abspath(path)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo generar el reporte:\n{e}")
+        self._run_background(write, done, "No se pudo generar el reporte")
 
     def _build_markdown_report(self) -> str:
-        fd = self.filtered
-        inc, exp, net = fd.totals()
-        gastos_cat = fd.by_category_expenses()
-        daily = fd.daily_series()
-        monthly = fd.monthly_net_series()
-        stats = fd.stats()
-        deep = analyze_finances(fd, self.settings)
-
-        period = self._suffix().strip()
-        lines = []
-        lines.append(f"# Reporte Finanzas {period}")
-        lines.append("")
-        lines.append("## KPIs")
-        lines.append(f"- **Ingresos:** {usd_fmt(inc)}")
-        lines.append(f"- **Gastos:** {usd_fmt(exp)}")
-        lines.append(f"- **Neto:** {usd_fmt(net)}")
-        lines.append(f"- **Ahorro (sobre ingresos):** {stats['ahorro_pct']:.2f}%")
-        if deep["runway_meses"] is not None:
-            lines.append(f"- **Runway estimado:** {deep['runway_meses']:.1f} meses (con saldo inicial {usd_fmt(self.settings.get('saldo_inicial',0.0))})")
-        lines.append("")
-        lines.append("## Análisis")
-        top3 = deep["top3_gastos"]
-        if top3:
-            lines.append("- **Top 3 gastos por categoría:**")
-            for c,v in top3:
-                lines.append(f"  - {c}: {usd_fmt(v)}")
-        lines.append(f"- **Objetivo de ahorro:** {deep['ahorro_obj_pct']:.1f}% | **Real:** {deep['ahorro_real_pct']:.1f}% | **Brecha:** {max(0.0, deep['gap_ahorro_pct']):.1f} pts")
-        lines.append(f"- **Break-even aproximado:** ingresos ≥ {usd_fmt(deep['break_even'])}")
-        if deep["alertas"]:
-            lines.append("")
-            lines.append("### Alertas")
-            for a in deep["alertas"]:
-                lines.append(f"- {a}")
-        if deep["recomendaciones"]:
-            lines.append("")
-            lines.append("### Recomendaciones")
-            for r in deep["recomendaciones"]:
-                lines.append(f"{r}")
-        lines.append("")
-        lines.append("## Gráficas recomendadas (si exportaste)")
-        lines.append("- 01_barras_ingresos_gastos*.png")
-        lines.append("- 02_pie_gastos*.png")
-        lines.append("- 03_dona_gastos*.png")
-        lines.append("- 04_linea_flujo*.png")
-        lines.append("- 05_waterfall_mensual*.png")
-        lines.append("- 06_boxplot_gastos*.png")
-        lines.append("- 07_pareto_gastos*.png")
-        lines.append("")
-        lines.append("> Generado por Finanzas GUI PRO+MD")
-        return "\n".join(lines)
+        b = compute_all(self.filtered, self.settings)
+        inc, exp, net = b.inc, b.exp, b.net
+        stats = b.stats; deep = b.deep
+
+        _usd = usd_fmt
+        top3 = deep["top3_gastos"]; runway = deep["runway_meses"]
+        return _REPORTE_MD.format(
+            period=self._suffix().strip(),
+            inc=_usd(inc), exp=_usd(exp), net=_usd(net), ahorro=stats["ahorro_pct"],
+            runway=(f"- **Runway estimado:** {runway:.1f} meses (con saldo inicial {_usd(self.settings.get('saldo_inicial',0.0))})\n"
+                    if runway is not None else ""),
+            top3=("- **Top 3 gastos por categoría:**\n" + "".join(f"  - {c}: {_usd(v)}\n" for c,v in top3)) if top3 else "",
+            obj=deep["ahorro_obj_pct"], real=deep["ahorro_real_pct"], brecha=max(0.0, deep["gap_ahorro_pct"]),
+            break_even=_usd(deep["break_even"]),
+            alertas="".join(["\n### Alertas\n", *[f"- {a}\n" for a in deep["alertas"]]]) if deep["alertas"] else "",
+            recomendaciones="".join(["\n### Recomendaciones\n", *[f"{r}\n" for r in deep["recomendaciones"]]]) if deep["recomendaciones"] else "",
+        )
 
     # Export
-    def _collect_figures(self) -> List[Tuple[str, plt.Figure]]:
+    def _export_jobs(self) -> List[Tuple[str, tuple, tuple]]:
+        """(nombre, tamaño en pulgadas, (plot, args)) de cada pestaña, tomado en el hilo de Tk.
+
+        Solo referencias a datos inmutables: las figuras de exportación se construyen en el hilo de fondo."""
         mapping = [
             ("01_barras_ingresos_gastos","barras"),
             ("02_pie_gastos","pie"),
@@ -750,46 +1059,74 @@ class FinanceApp(tk.Tk):
             ("06_boxplot_gastos","box"),
             ("07_pareto_gastos","pareto"),
         ]
-        out=[]
-        for base,key in mapping:
-            fig = self.tabs[key]["figure"]
-            if fig: out.append((base, fig))
-        return out
+        return [(base, tuple(self.tabs[key]["figure"].get_size_inches()), self._plots[key])
+                for base, key in mapping if key in self._plots]
+
+    def _map_figures(self, jobs: List[Tuple[str, tuple, tuple]], fn) -> list:
+        """Construye cada figura (Figure + FigureCanvasAgg propios) y le aplica `fn(base, fig)`, en paralelo."""
+        def build(job):
+            base, size, (plot, args) = job
+            fig = Figure(figsize=size, dpi=100); FigureCanvasAgg(fig); plot(fig, *args)
+            return fn(base, fig)
+        if not jobs: return []
+        with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as ex:
+            return list(ex.map(build, jobs))
+
+    def _render_pngs(self, jobs: List[Tuple[str, tuple, tuple]]) -> List[Tuple[str, bytes]]:
+        """Rasteriza las figuras a PNG en memoria."""
+        return self._map_figures(jobs, lambda base, fig: (base, figure_png_bytes(fig)))
+
+    def _run_background(self, work, done, err: str="No se pudo exportar"):
+        """Ejecuta `work()` fuera del mainloop y entrega el resultado a `done` vía `after` (hilo de Tk)."""
+        def runner():
+            try: res = work()
+            except Exception as e:
+                self.after(0, lambda e=e: (self.status(err), messagebox.showerror("Error", f"{err}:\n{e}")))
+            else:
+                self.after(0, lambda: done(res))
+        threading.Thread(target=runner, daemon=True).start()
 
     def export_all_png(self):
         folder = filedialog.askdirectory(title="Carpeta destino para PNGs")
         if not folder: return
         suf = self._suffix().replace(" ","_").replace("..","_")
-        cnt = 0
-        for base,fig in self._collect_figures():
-            p = os.path.join(folder, f"{base}{suf}.png")
-            fig.savefig(p, dpi=150, bbox_inches="tight"); cnt+=1
-        self.status(f"Exportadas {cnt} PNG a {folder}")
-        messagebox.showinfo("Exportación", f"Exportadas {cnt} imágenes en:\n{folder}")
+        jobs = self._export_jobs()
+        def work():
+            return len(self._map_figures(jobs, lambda base, fig: fig.savefig(os.path.join(folder, f"{base}{suf}.png"),
+                                                                             **PNG_SAVE_KW)))
+        def done(cnt):
+            self.status(f"Exportadas {cnt} PNG a {folder}")
+            messagebox.showinfo("Exportación", f"Exportadas {cnt} imágenes en:\n{folder}")
+        self.status("Exportando PNG..."); self._run_background(work, done)
 
     def export_zip(self):
         folder = filedialog.askdirectory(title="Carpeta para ZIP")
         if not folder: return
         suf = self._suffix().replace(" ","_").replace("..","_")
         zip_path = os.path.join(folder, f"graficas{suf}.zip")
-        tmp=[]
-        for base,fig in self._collect_figures():
-            p = os.path.join(folder, f"{base}{suf}.png")
-            fig.savefig(p, dpi=150, bbox_inches="tight"); tmp.append(p)
-        with zipfile.ZipFile(zip_path,"w",zipfile.ZIP_DEFLATED) as zf:
-            for p in tmp: zf.write(p, arcname=os.path.basename(p))
-        self.status(f"ZIP: {zip_path}")
-        messagebox.showinfo("ZIP creado", f"Guardado en:\n{zip_path}")
+        jobs = self._export_jobs()
+        def work():
+            pngs = self._render_pngs(jobs)
+            with zipfile.ZipFile(zip_path,"w",zipfile.ZIP_STORED) as zf:   # los PNG ya van comprimidos
+                for base, data in pngs: zf.writestr(f"{base}{suf}.png", data)
+        def done(_):
+            self.status(f"ZIP: {zip_path}")
+            messagebox.showinfo("ZIP creado", f"Guardado en:\n{zip_path}")
+        self.status("Creando ZIP..."); self._run_background(work, done)
 
     def export_pdf(self):
         path = filedialog.asksaveasfilename(title="Guardar PDF", defaultextension=".pdf",
                                             filetypes=[("PDF","*.pdf")])
         if not path: return
-        with PdfPages(path) as pdf:
-            for base, fig in self._collect_figures():
-                pdf.savefig(fig, bbox_inches="tight")
-        self.status(f"PDF: {path}")
-        messagebox.showinfo("PDF exportado", f"Se guardó en:\n{path}")
+        jobs = self._export_jobs()
+        def work():
+            figs = self._map_figures(jobs, lambda base, fig: fig)
+            with PdfPages(path, metadata=PDF_METADATA) as pdf:
+                for fig in figs: pdf.savefig(fig, bbox_inches="tight")
+        def done(_):
+            self.status(f"PDF: {path}")
+            messagebox.showinfo("PDF exportado", f"Se guardó en:\n{path}")
+        self.status("Exportando PDF..."); self._run_background(work, done)
 
     def status(self, txt:str): self.status_var.set(txt)
 